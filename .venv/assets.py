@@ -0,0 +1,107 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+import pygame
+
+TEXT_CACHE_SIZE = 512
+
+# Декодированные с диска картинки (заполняются в том числе фоновым потоком); после перевода в формат экрана
+# исходник удаляется, чтобы большие фоны не хранились дважды
+_decoded = {}
+_converted = set()
+# Готовые к выводу картинки, ключ - (имя файла, colorkey)
+_images = {}
+# Нарезанные кадры анимаций и их зеркальные копии, ключ - (лист, столбцы, строки)
+_sheets = {}
+# Отрисованные строки текста, ключ - (шрифт, строка, цвет, сглаживание); давно не использованные вытесняются
+_texts = OrderedDict()
+_preloader = None
+
+
+def _decode(name):
+    surface = _decoded.get(name)
+    if surface is None:
+        surface = pygame.image.load(os.path.join('data', name))
+        _decoded[name] = surface
+    return surface
+
+
+def load_image(name, colorkey=None):
+    key = (name, colorkey)
+    if key in _images:
+        return _images[key]
+    fullname = os.path.join('data', name)
+    # если файл не существует, то выходим
+    if not os.path.isfile(fullname):
+        print(f"Файл с изображением '{fullname}' не найден")
+        sys.exit()
+    image = _decode(name)
+    if pygame.display.get_surface() is None:
+        # Без окна перевести картинку в формат экрана нельзя, поэтому не кешируем её
+        if colorkey is not None:
+            image = image.copy()
+            image.set_colorkey(image.get_at((0, 0)) if colorkey == -1 else colorkey)
+        return image
+    if colorkey is not None:
+        image = image.convert()
+        if colorkey == -1:
+            colorkey = image.get_at((0, 0))
+        image.set_colorkey(colorkey)
+    elif image.get_alpha() is not None:
+        image = image.convert_alpha()
+    else:
+        image = image.convert()
+    _images[key] = image
+    _decoded.pop(name, None)
+    _converted.add(name)
+    return image
+
+
+def cut_sheet(sheet, columns, rows):
+    key = (sheet, columns, rows)
+    if key not in _sheets:
+        width = sheet.get_width() // columns
+        height = sheet.get_height() // rows
+        frames = []
+        for j in range(rows):
+            for i in range(columns):
+                frames.append(sheet.subsurface(pygame.Rect(width * i, height * j, width, height)))
+        mirrored_frames = [pygame.transform.flip(frame, True, False) for frame in frames]
+        _sheets[key] = frames, mirrored_frames
+    return _sheets[key]
+
+
+def render_text(font, text, color, antialias=True):
+    key = (font, text, color, antialias)
+    surface = _texts.get(key)
+    if surface is None:
+        surface = font.render(text, antialias, color)
+        _texts[key] = surface
+        if len(_texts) > TEXT_CACHE_SIZE:
+            _texts.popitem(last=False)
+    else:
+        _texts.move_to_end(key)
+    return surface
+
+
+def _preload(names):
+    for name in names:
+        if name in _decoded or name in _converted or not os.path.isfile(os.path.join('data', name)):
+            continue
+        try:
+            _decode(name)
+        except pygame.error as error:
+            print(f"Не удалось загрузить '{name}': {error}")
+
+
+def preload(names):
+    # Декодирование PNG идёт в фоне, пока открыто стартовое окно; convert() выполняется уже в основном потоке
+    global _preloader
+    _preloader = threading.Thread(target=_preload, args=(list(names),), daemon=True)
+    _preloader.start()
+
+
+def wait_preload():
+    if _preloader is not None:
+        _preloader.join()
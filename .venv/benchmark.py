@@ -0,0 +1,159 @@
+import os
+import sys
+import glob
+import json
+import time
+import random
+import argparse
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import main
+import solver
+
+MOVES = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+
+def generate_level(width, height, monsters, seed=0):
+    # Случайный лабиринт со стенами по краю, игроком в центре и патрулирующими монстрами
+    rnd = random.Random(seed)
+    rows = [['#'] * width for _ in range(height)]
+    for y in range(1, height - 1):
+        for x in range(1, width - 1):
+            rows[y][x] = rnd.choices('.1#SW*ry', weights=[70, 5, 12, 4, 2, 5, 1, 1])[0]
+    player_x, player_y = width // 2, height // 2
+    rows[player_y][player_x] = 'P'
+    camera_x = main.BOARD_WIDTH // 2 * main.TILE_SIZE - player_x * main.TILE_SIZE
+    camera_y = main.BOARD_HEIGHT // 2 * main.TILE_SIZE - player_y * main.TILE_SIZE
+    trajectories = []
+    for _ in range(monsters):
+        side = rnd.randint(2, 6)
+        x = rnd.randint(1, width - side - 2)
+        y = rnd.randint(1, height - side - 2)
+        rows[y][x] = 'M'
+        # Траектории задаются в экранных координатах стартового кадра, как в data/trajectoryN_K.txt
+        corners = [(x, y), (x + side, y), (x + side, y + side), (x, y + side)]
+        trajectories.append([[cx * main.TILE_SIZE + camera_x, cy * main.TILE_SIZE + camera_y]
+                             for cx, cy in corners])
+    # Портал ставится последним, чтобы не сдвигать случайную раскладку монстров
+    portal_x, portal_y = rnd.randint(1, width - 2), rnd.randint(1, height - 2)
+    if rows[portal_y][portal_x] != 'P':
+        rows[portal_y][portal_x] = 'O'
+    return [''.join(row) for row in rows], trajectories
+
+
+def scenarios():
+    yield 'level1.txt', main.LEVEL1_FILE, None
+    yield 'level2.txt', main.LEVEL2_FILE, None
+    for width, height, monsters in ((64, 64, 50), (160, 160, 250)):
+        level, trajectories = generate_level(width, height, monsters)
+        yield f'synthetic {width}x{height} M={monsters}', level, trajectories
+
+
+def run(level, trajectories, ticks, seed=0):
+    rnd = random.Random(seed)
+    simulation = main.Simulation(level, trajectories)
+    timings = []
+    for _ in range(ticks):
+        if simulation.game_over or simulation.level_complete:
+            simulation.load(level, trajectories)
+        if rnd.random() < 0.3:
+            simulation.press(*rnd.choice(MOVES))
+        start = time.perf_counter()
+        simulation.step()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    total = sum(timings)
+    return {'ticks': ticks,
+            'ticks_per_second': ticks / total,
+            'mean_ms': total / ticks * 1000,
+            'p50_ms': timings[ticks // 2] * 1000,
+            'p95_ms': timings[int(ticks * 0.95)] * 1000,
+            'max_ms': timings[-1] * 1000}
+
+
+def replay_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(glob.glob(os.path.join(path, '*.json')))
+        else:
+            yield path
+
+
+def verify(paths):
+    # Повтор должен привести симуляцию ровно к сохранённому итогу, иначе логика стала недетерминированной
+    failed = False
+    for filename in replay_files(paths):
+        simulation, matches = main.Simulation.replay(filename)
+        print(f"{filename}: {'OK' if matches else 'MISMATCH'} ({simulation.tick} ticks)")
+        failed = failed or not matches
+    return failed
+
+
+def solve_levels(max_states):
+    # Время проверки уровней solver.py на тех же картах, включая построение оценок
+    print(f"{'scenario':<28}{'chips':>7}{'states':>9}{'moves':>7}{'timed':>7}{'seconds':>9}  verdict")
+    for name, level, trajectories in scenarios():
+        rows = solver.read_level(level) if isinstance(level, str) else level
+        start = time.perf_counter()
+        result, expanded, proven = solver.validate(solver.Level(rows), max_states)
+        seconds = time.perf_counter() - start
+        chips = sum(row.count('*') for row in rows)
+        if result:
+            verdict = 'optimal' if proven else 'not proven'
+            print(f"{name:<28}{chips:>7}{expanded:>9}{len(result[1]):>7}{result[0]:>7}{seconds:>9.2f}  {verdict}")
+        else:
+            verdict = 'unsolvable' if result is False else 'state limit'
+            print(f"{name:<28}{chips:>7}{expanded:>9}{'-':>7}{'-':>7}{seconds:>9.2f}  {verdict}")
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description='Замер скорости симуляции без окна')
+    parser.add_argument('--ticks', type=int, default=3000)
+    parser.add_argument('--save', help='сохранить результаты в JSON')
+    parser.add_argument('--compare', help='сравнить с сохранёнными результатами')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='допустимое падение ticks/s относительно --compare')
+    parser.add_argument('--verify', nargs='+', metavar='REPLAY',
+                        help='вместо замера проиграть повторы (файлы или каталоги из main.py --record)')
+    parser.add_argument('--solve', action='store_true', help='вместо замера симуляции проверить уровни solver.py')
+    parser.add_argument('--max-states', type=int, default=500000, help='лимит состояний для --solve')
+    args = parser.parse_args()
+
+    if args.solve:
+        solve_levels(args.max_states)
+        return 0
+
+    if args.verify:
+        failed = verify(args.verify)
+        return 1 if failed else 0
+
+    results = {}
+    print(f"{'scenario':<28}{'ticks/s':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for name, level, trajectories in scenarios():
+        result = run(level, trajectories, args.ticks)
+        results[name] = result
+        print(f"{name:<28}{result['ticks_per_second']:>10.0f}{result['mean_ms']:>10.3f}"
+              f"{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}{result['max_ms']:>10.3f}")
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    failed = False
+    if args.compare:
+        with open(args.compare, 'r') as file:
+            baseline = json.load(file)
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            ratio = result['ticks_per_second'] / baseline[name]['ticks_per_second']
+            if ratio < 1 - args.tolerance:
+                print(f"Регрессия в '{name}': {ratio:.0%} от сохранённой скорости")
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_benchmark())
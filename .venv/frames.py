@@ -0,0 +1,131 @@
+import csv
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pygame
+
+# wait - сон в ожидании событий и до следующего кадра, чтобы он не попадал во время обработки
+PHASES = ('events', 'simulation', 'draw', 'flip', 'wait')
+
+
+class FrameScheduler:
+    # Общий цикл кадра для всех экранов: логика идёт фиксированными тиками, отрисовка - со своей частотой,
+    # а статичные экраны спят в ожидании событий. Время каждой фазы кадра записывается для профилирования
+    def __init__(self, ticks_per_second=30, frames_per_second=30, idle_frames_per_second=10, history=36000):
+        self.clock = pygame.time.Clock()
+        self.tick_ms = 1000 / ticks_per_second
+        self.frames_per_second = frames_per_second
+        self.idle_frames_per_second = idle_frames_per_second
+        self.lag = 0
+        self.last_tick = pygame.time.get_ticks()
+        self.frames = deque(maxlen=history)
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.ticks = 0
+        self.frame_start = time.perf_counter()
+        self.show_overlay = False
+        self.font = None
+        self.overlay_rect = None
+
+    @property
+    def now(self):
+        return pygame.time.get_ticks()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            # Если внутри фазы отработали свои кадры (модальное окно), они уже записаны, считаем только остаток
+            self.current[name] += (time.perf_counter() - max(start, self.frame_start)) * 1000
+
+    def events(self, idle=False):
+        # На статичном экране ждём первое событие не дольше одного «холостого» кадра, не занимая процессор.
+        # Обработку полученных событий вызывающий код оборачивает в phase('events')
+        events = []
+        if idle:
+            with self.phase('wait'):
+                event = pygame.event.wait(1000 // self.idle_frames_per_second)
+            if event.type != pygame.NOEVENT:
+                events.append(event)
+        with self.phase('events'):
+            events.extend(pygame.event.get())
+            for event in events:
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self.show_overlay = not self.show_overlay
+        return events
+
+    def logic_ticks(self, paused=False):
+        # Сколько фиксированных тиков логики пора выполнить; накопленное время ограничено, чтобы не догонять после пауз
+        now = self.now
+        self.lag = 0 if paused else min(self.lag + now - self.last_tick, self.tick_ms * 5)
+        self.last_tick = now
+        ticks = int(self.lag // self.tick_ms)
+        self.lag -= ticks * self.tick_ms
+        self.ticks += ticks
+        return ticks
+
+    def present(self, screen, dirty_rects=None):
+        with self.phase('draw'):
+            overlay_rect = self.draw_overlay(screen)
+        with self.phase('flip'):
+            if dirty_rects is None:
+                pygame.display.flip()
+            else:
+                if overlay_rect is not None:
+                    dirty_rects = dirty_rects + [overlay_rect]
+                if self.overlay_rect is not None:
+                    # Закрытый оверлей тоже надо стереть с экрана
+                    dirty_rects = dirty_rects + [self.overlay_rect]
+                pygame.display.update(dirty_rects)
+        self.overlay_rect = overlay_rect
+
+    def end_frame(self, idle=False):
+        with self.phase('wait'):
+            self.clock.tick(self.idle_frames_per_second if idle else self.frames_per_second)
+        end = time.perf_counter()
+        frame = {'time_ms': self.now, 'ticks': self.ticks, 'idle': idle}
+        frame.update(self.current)
+        frame['frame'] = (end - self.frame_start) * 1000
+        self.frames.append(frame)
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.ticks = 0
+        self.frame_start = end
+
+    def averages(self, count=60):
+        frames = list(self.frames)[-count:]
+        if not frames:
+            return {}
+        return {name: sum(frame[name] for frame in frames) / len(frames) for name in PHASES + ('frame',)}
+
+    def draw_overlay(self, screen):
+        if not self.show_overlay:
+            return None
+        if self.font is None:
+            self.font = pygame.font.Font(None, 22)
+        averages = self.averages()
+        lines = [f"fps: {1000 / averages['frame']:.0f}" if averages.get('frame') else 'fps: -']
+        lines += [f"{name}: {averages.get(name, 0):.2f} ms" for name in PHASES]
+        surfaces = [self.font.render(line, True, (255, 255, 255)) for line in lines]
+        width = max(surface.get_width() for surface in surfaces) + 10
+        height = sum(surface.get_height() for surface in surfaces) + 10
+        rect = pygame.Rect(screen.get_width() - width - 10, 10, width, height)
+        screen.fill((0, 0, 0), rect)
+        y = rect.y + 5
+        for surface in surfaces:
+            screen.blit(surface, (rect.x + 5, y))
+            y += surface.get_height()
+        return rect
+
+    def export(self, filename):
+        # Формат выбирается по расширению: .json или CSV во всех остальных случаях
+        frames = list(self.frames)
+        with open(filename, 'w', newline='') as file:
+            if filename.endswith('.json'):
+                json.dump(frames, file, indent=2)
+            else:
+                writer = csv.DictWriter(file, fieldnames=['time_ms', 'ticks', 'idle'] + list(PHASES) + ['frame'])
+                writer.writeheader()
+                writer.writerows(frames)
@@ -0,0 +1,1191 @@
+import re
+import sys
+import json
+import argparse
+import pygame
+import os
+import numpy as np
+import assets
+from assets import load_image, render_text
+from scores import ScoreStore
+from frames import FrameScheduler
+
+pygame.init()
+# База рекордов открывается при первом обращении: импорт main и Simulation без окна её не трогают
+score_store = None
+SCREEN_WIDTH = 1000
+SCREEN_HEIGHT = 850
+BOARD_WIDTH = 9
+BOARD_HEIGHT = 9
+TILE_SIZE = 60
+GREEN = (21, 71, 52)
+BLACK = (0, 0, 0)
+GRAY = (200, 200, 200)
+YELLOW = (255, 255, 0)
+LIGHT_YELLOW = (255, 255, 150)
+WHITE = (255, 255, 255)
+GRID_LINE_COLOR = BLACK
+LEVEL1_FILE = 'level1.txt'
+LEVEL2_FILE = "level2.txt"
+TICKS_PER_SECOND = 30
+FRAMES_PER_SECOND = 30
+IDLE_FRAMES_PER_SECOND = 10
+ANIMATION_MS = 100
+size = SCREEN_WIDTH, SCREEN_HEIGHT
+all_sprites = pygame.sprite.Group()
+
+
+PICTURE_FILES = {
+    '#': ('стены.png', None),
+    '1': ('плитка 1.png', None),
+    '2': ('плитка 2.png', None),
+    '3': ('плитка 3.png', None),
+    '4': ('плитка черепки.png', None),
+    'Z': ('стены с зеленью.png', None),
+    'C': ('стены с цепями.png', None),
+    '.': ('простая плитка.png', None),
+    'y': ('ключ белый и жёлтый.png', -1),
+    'b': ('ключ белый и синий.png', -1),
+    'g': ('ключ белый и зелёный.png', -1),
+    'r': ('ключ белый и красный.png', -1),
+    'Y': ('дверь жёлтый.png', None),
+    'B': ('дверь синий.png', None),
+    'G': ('дверь зелёный.png', None),
+    'R': ('дверь красный.png', None),
+    'W': ('water_.png', None),
+    'S': ('sand.png', None),
+    '*': ('сундук.png', None),
+    'P': ('rog_run_.png', -1),
+    'O': ('none_activated_portal.png', -1),
+    'M': ('skeleton_run.png', -1)
+}
+ASSET_FILES = [name for name, colorkey in PICTURE_FILES.values()] + [
+    'activated_portal.png', 'pause_.png', 'pressed_pause_.png', 'level_but.png', 'win.png', 'die_window_.png']
+pictures = {}
+
+
+def get_score_store():
+    global score_store
+    if score_store is None:
+        score_store = ScoreStore()
+    return score_store
+
+
+def close_score_store():
+    global score_store
+    if score_store is not None:
+        score_store.close()
+        score_store = None
+
+
+def load_pictures():
+    for tile_type, (name, colorkey) in PICTURE_FILES.items():
+        pictures[tile_type] = load_image(name, colorkey=colorkey)
+
+
+class Base(pygame.sprite.Sprite):
+    def __init__(self, x, y, color, indicator=0, columns=1, rows=1):
+        super().__init__(all_sprites)
+        self.indicator = indicator
+        self.cut_sheet(color, columns, rows)
+        self.cur_frame = 0
+        self.image = self.frames[self.cur_frame]
+        self.rect = self.image.get_rect()
+        self.rect.x = x * TILE_SIZE
+        self.rect.y = y * TILE_SIZE
+        self.flag_for_reverse = -1
+
+    def move(self, dx, dy):
+        self.rect.x += dx * TILE_SIZE
+        self.rect.y += dy * TILE_SIZE
+
+    def cut_sheet(self, sheet, columns, rows):
+        self.rect = pygame.Rect(0, 0, sheet.get_width() // columns, sheet.get_height() // rows)
+        self.frames, self.mirrored_frames = assets.cut_sheet(sheet, columns, rows)
+
+    def reverse_image(self, dx):
+        if dx == 0:
+            return
+        if dx != self.flag_for_reverse:
+            self.frames, self.mirrored_frames = self.mirrored_frames, self.frames
+            self.flag_for_reverse = dx
+
+    def update(self):
+        self.cur_frame = (self.cur_frame + 1) % len(self.frames)
+        self.image = self.frames[self.cur_frame]
+
+
+class Player(Base):
+    def __init__(self, x, y, color, columns):
+        super().__init__(x, y, color, columns=columns)
+        self.mask = pygame.mask.from_surface(self.image)
+
+
+class Door(Base):
+    def __init__(self, x, y, color, indicator, columns):
+        super().__init__(x, y, color, indicator=indicator, columns=columns)
+        self.is_open = False
+
+
+class Monster(Base):
+    def __init__(self, color, trajectory, columns):
+        # Траектория задаётся файлом в data/ или готовым списком точек
+        if isinstance(trajectory, str):
+            self.trajectory = self.load_trajectory(trajectory)
+        else:
+            self.trajectory = [[float(x), float(y)] for x, y in trajectory]
+        self.speed = 5
+        self.x, self.y = self.trajectory[0]
+        super().__init__(0, 0, color, columns=columns)
+        self.rect.x = self.x
+        self.rect.y = self.y
+        self.mask = pygame.mask.from_surface(self.image)
+
+    def load_trajectory(self, filename):
+        trajectory = []
+        with open(f'data/{filename}', 'r') as file:
+            for line in file:
+                x, y = map(float, line.strip().split(','))
+                trajectory.append([x, y])
+        return trajectory
+
+    def move(self, dx, dy):
+        self.x += dx * TILE_SIZE
+        self.y += dy * TILE_SIZE
+        for pos in self.trajectory:
+            pos[0] += dx * TILE_SIZE
+            pos[1] += dy * TILE_SIZE
+        self.rect.x = self.x
+        self.rect.y = self.y
+
+
+class MonsterSwarm:
+    # Все монстры уровня сдвигаются за один векторный шаг по своим траекториям
+    def __init__(self, monsters):
+        self.monsters = list(monsters)
+        lengths = np.array([len(monster.trajectory) for monster in self.monsters], dtype=int)
+        self.start = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(int)
+        self.length = lengths
+        self.segment = np.zeros(len(self.monsters), dtype=int)
+        self.position = np.array([[monster.x, monster.y] for monster in self.monsters], dtype=float).reshape(-1, 2)
+        # Для каждой точки траектории заранее считаем следующую точку и вектор скорости до неё
+        points = np.array([point for monster in self.monsters for point in monster.trajectory],
+                          dtype=float).reshape(-1, 2)
+        next_index = np.concatenate([start + (np.arange(length) + 1) % length
+                                     for start, length in zip(self.start, lengths)] or [[]]).astype(int)
+        self.target = points[next_index]
+        delta = self.target - points
+        distance = np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2)
+        speed = np.repeat([monster.speed for monster in self.monsters], lengths)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.velocity = np.where(distance[:, None] > 0, speed[:, None] * delta / distance[:, None], 0)
+        self.delta_x = delta[:, 0]
+        for i in range(len(self.monsters)):
+            self.turn(i)
+
+    def turn(self, i):
+        self.monsters[i].reverse_image(float(self.delta_x[self.start[i] + self.segment[i]]))
+
+    def update(self):
+        if not self.monsters:
+            return
+        current = self.start + self.segment
+        velocity = self.velocity[current]
+        target = self.target[current]
+        moved = self.position + velocity
+        for monster, (x, y) in zip(self.monsters, moved.tolist()):
+            monster.rect.x = x
+            monster.rect.y = y
+        # Проверка достижения точки
+        overshoot = ((velocity > 0) & (moved >= target)) | ((velocity < 0) & (moved <= target))
+        self.position = np.where(overshoot, target, moved)
+        arrived = np.nonzero((self.position == target).all(axis=1))[0]
+        if len(arrived):
+            self.segment[arrived] = (self.segment[arrived] + 1) % self.length[arrived]
+            for i in arrived:
+                self.turn(i)
+
+
+def load_level(filename):
+    level_data = []
+    try:
+        with open(f'data/{filename}', 'r') as file:
+            for line in file:
+                level_data.append(line.strip())
+    except FileNotFoundError:
+        print(f"File {filename} not found")
+        return []
+    return level_data
+
+
+def level_trajectories(filename):
+    # Для levelN.txt траектории монстров лежат в trajectoryN_1.txt, trajectoryN_2.txt, ... по порядку 'M' на карте
+    # (построчно, слева направо); уровню с одним монстром хватает trajectoryN.txt
+    match = re.fullmatch(r'level(\d+)\.txt', os.path.basename(filename))
+    if match is None:
+        raise ValueError(f"Имя уровня '{filename}' не подходит под levelN.txt, траектории монстров для него "
+                         "не найти; передайте их явно")
+    number = match.group(1)
+    trajectories = []
+    while os.path.isfile(f'data/trajectory{number}_{len(trajectories) + 1}.txt'):
+        trajectories.append(f'trajectory{number}_{len(trajectories) + 1}.txt')
+    if not trajectories and os.path.isfile(f'data/trajectory{number}.txt'):
+        trajectories.append(f'trajectory{number}.txt')
+    return trajectories
+
+
+def create_level(level_data, trajectories):
+    if isinstance(trajectories, str):
+        trajectories = [trajectories]
+    if not pictures:
+        load_pictures()
+    wall = pygame.sprite.Group()
+    floor = pygame.sprite.Group()
+    player = pygame.sprite.Group()
+    keys = pygame.sprite.Group()
+    doors = pygame.sprite.Group()
+    chips = pygame.sprite.Group()
+    water = pygame.sprite.Group()
+    sand = pygame.sprite.Group()
+    portal = pygame.sprite.Group()
+    monsters = pygame.sprite.Group()
+    p1 = None
+    for y, row in enumerate(level_data):
+        for x, tile_type in enumerate(row):
+            if tile_type == '[' or tile_type == '>':
+                continue
+            if tile_type != 'M':
+                tile = Base(x, y, pictures[tile_type])
+            if tile_type in '#ZC':
+                wall.add(tile)
+            elif tile_type == 'P':
+                p1 = Player(x, y, pictures['P'], columns=6)
+                player.add(p1)
+                floor.add(Base(x, y, pictures['.']))
+            elif tile_type in 'rbgy':
+                tile.indicator = 'rbgy'.index(tile_type)
+                keys.add(tile)
+                floor.add(Base(x, y, pictures['.']))
+            elif tile_type in 'RBGY':
+                tile.indicator = 'RBGY'.index(tile_type)
+                doors.add(tile)
+                floor.add(Base(x, y, pictures['.']))
+            elif tile_type == '*':
+                chips.add(tile)
+                floor.add(Base(x, y, pictures['.']))
+            elif tile_type == 'W':
+                water.add(Base(x, y, pictures[tile_type], columns=6))
+                floor.add(Base(x, y, pictures['.']))
+            elif tile_type == 'S':
+                sand.add(tile)
+                floor.add(Base(x, y, pictures['.']))
+            elif tile_type == 'O':
+                portal.add(tile)
+                floor.add(Base(x, y, pictures['.']))
+            elif tile_type == 'M':
+                # Каждый следующий монстр берёт следующую траекторию из списка
+                if len(monsters) >= len(trajectories):
+                    raise ValueError(f"На уровне больше монстров 'M', чем траекторий ({len(trajectories)})")
+                monster = Monster(pictures['M'], trajectories[len(monsters)], columns=6)
+                monsters.add(monster)
+                floor.add(Base(x, y, pictures['.']))
+            elif tile_type in '.1234':
+                floor.add(tile)
+    return wall, floor, player, p1, keys, doors, chips, water, sand, portal, monsters
+
+
+class GridIndex:
+    # Клетки уровня: ключ - (вид объекта, x, y) в клетках мировой сетки
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.monster_cells = {}
+
+    def cell(self, rect):
+        return rect.x // self.cell_size, rect.y // self.cell_size
+
+    def add(self, kind, sprite):
+        self.cells[(kind,) + self.cell(sprite.rect)] = sprite
+
+    def remove(self, kind, sprite):
+        self.cells.pop((kind,) + self.cell(sprite.rect), None)
+
+    def get(self, kind, cell):
+        return self.cells.get((kind,) + cell)
+
+    def place_monsters(self, monsters):
+        self.monster_cells = {}
+        for monster in monsters:
+            self.monster_cells.setdefault(self.cell(monster.rect), []).append(monster)
+
+    def monsters_in(self, cells):
+        for cell in cells:
+            yield from self.monster_cells.get(cell, ())
+
+    def monsters_near(self, cell):
+        x, y = cell
+        for nx in range(x - 1, x + 2):
+            for ny in range(y - 1, y + 2):
+                yield from self.monster_cells.get((nx, ny), ())
+
+
+class Board:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.board = [[0] * width for _ in range(height)]
+        self.left = (SCREEN_WIDTH - width * TILE_SIZE) // 2
+        self.top = 0
+        self.cell_size = TILE_SIZE
+        self.camera_x = 0
+        self.camera_y = 0
+        self.index = GridIndex(TILE_SIZE)
+        self.screen_2 = pygame.Surface((self.width * self.cell_size,
+                                        self.height * self.cell_size))
+        self.static_layer = None
+        self.grid_layer = None
+        self.last_rects = []
+
+    def set_view(self, left, top, cell_size):
+        self.left = left
+        self.top = top
+        self.cell_size = cell_size
+        self.screen_2 = pygame.Surface((self.width * self.cell_size, self.height * self.cell_size))
+        self.static_layer = None
+        self.grid_layer = None
+
+    def render(self, screen):
+        for y in range(self.height):
+            for x in range(self.width):
+                pygame.draw.rect(screen, GRAY, (
+                    x * self.cell_size,
+                    y * self.cell_size, self.cell_size,
+                    self.cell_size), width=1)
+                pygame.draw.rect(screen, BLACK, (
+                    x * self.cell_size + 1,
+                    y * self.cell_size + 1, self.cell_size - 2,
+                    self.cell_size - 2))
+
+    def get_click(self, mouse_pos):
+        cell = self.get_cell(mouse_pos)
+        self.on_click(cell)
+
+    def get_cell(self, mouse_pos):
+        if self.left <= mouse_pos[0] < self.left + self.width * self.cell_size and \
+                self.top <= mouse_pos[1] < self.top + self.height * self.cell_size:
+            return (int((mouse_pos[1] - self.top) / self.cell_size),
+                    int((mouse_pos[0] - self.left) / self.cell_size))
+        else:
+            return None
+
+    def on_click(self, cell_coords):
+        pass
+
+    def load_level(self, filename, trajectories=None):
+        level_data = load_level(filename) if isinstance(filename, str) else filename
+        if trajectories is None:
+            trajectories = level_trajectories(filename) if isinstance(filename, str) else []
+        (self.wall, self.floor, self.player, self.p1, self.keys, self.doors, self.chips, self.water,
+         self.sand, self.portal, self.monsters) = create_level(level_data, trajectories)
+        self.center_camera()
+        self.static_layer = None
+        # Траектории заданы в экранных координатах стартового кадра, переводим их в мировые
+        for monster in self.monsters:
+            monster.move(-self.camera_x // TILE_SIZE, -self.camera_y // TILE_SIZE)
+        self.swarm = MonsterSwarm(self.monsters)
+        self.index = GridIndex(TILE_SIZE)
+        for kind, group in (('wall', self.wall), ('floor', self.floor), ('water', self.water), ('sand', self.sand),
+                            ('key', self.keys), ('door', self.doors), ('chip', self.chips), ('portal', self.portal)):
+            for tile in group:
+                self.index.add(kind, tile)
+        self.index.place_monsters(self.monsters)
+
+    def center_camera(self):
+        # Все объекты остаются в мировых координатах, смещение камеры применяется только при отрисовке
+        self.camera_x = self.width // 2 * self.cell_size - self.p1.rect.x
+        self.camera_y = self.height // 2 * self.cell_size - self.p1.rect.y
+
+    def player_on(self, kind):
+        return self.index.get(kind, self.index.cell(self.p1.rect))
+
+    def move_level(self, dx, dy, inventory, chips_left):
+        if dx == 0 and dy == 0:
+            return chips_left
+        self.p1.reverse_image(dx)
+        x, y = self.index.cell(self.p1.rect)
+        cell = (x - dx, y - dy)
+        behind = (x - 2 * dx, y - 2 * dy)
+        if self.index.get('wall', cell):
+            return chips_left
+        door = self.index.get('door', cell)
+        if door and not any(item.indicator == door.indicator for item in inventory.items):
+            # Блокируем проход, если дверь не открыта
+            return chips_left
+        sand = self.index.get('sand', cell)
+        if sand:
+            if self.index.get('wall', behind) or self.index.get('sand', behind):
+                return chips_left
+            self.index.remove('sand', sand)
+            sand.move(-dx, -dy)
+            water = self.index.get('water', behind)
+            if water:
+                # Песок засыпает воду
+                self.index.remove('water', water)
+                self.water.remove(water)
+                self.sand.remove(sand)
+            else:
+                self.index.add('sand', sand)
+        self.p1.move(-dx, -dy)
+        if door:
+            door.is_open = True
+            self.index.remove('door', door)
+            self.doors.remove(door)
+        key = self.index.get('key', cell)
+        if key:
+            self.index.remove('key', key)
+            inventory.add_to_inventory(key)
+            self.keys.remove(key)
+        chip = self.index.get('chip', cell)
+        if chip:
+            self.index.remove('chip', chip)
+            self.chips.remove(chip)
+            chips_left -= 1
+        self.camera_x += dx * self.cell_size
+        self.camera_y += dy * self.cell_size
+        return chips_left
+
+    def move_monsters(self):
+        self.swarm.update()
+        self.index.place_monsters(self.monsters)
+
+    def draw_group(self, group, surface):
+        for sprite in group:
+            surface.blit(sprite.image, sprite.rect.move(self.camera_x, self.camera_y))
+
+    def visible_cells(self, margin=0, camera=None):
+        # Клетки мировой сетки, попадающие в окно камеры (с запасом margin клеток с каждой стороны)
+        camera_x, camera_y = camera or (self.camera_x, self.camera_y)
+        left = -camera_x // self.index.cell_size - margin
+        top = -camera_y // self.index.cell_size - margin
+        return [(x, y) for y in range(top, top + self.height + 2 * margin)
+                for x in range(left, left + self.width + 2 * margin)]
+
+    def visible(self, kind, cells):
+        return [sprite for sprite in (self.index.get(kind, cell) for cell in cells) if sprite is not None]
+
+    def update_static_layer(self, cells):
+        # Сетка, стены и пол не меняются, поэтому слой с ними рисуется один раз. При ходе камера сдвигается:
+        # слой прокручивается, а дорисовываются только открывшиеся клетки, так что ход не зависит от размера карты
+        camera = (self.camera_x, self.camera_y)
+        if self.static_layer is not None and camera == self.static_camera:
+            return False
+        if self.grid_layer is None:
+            self.grid_layer = pygame.Surface(self.screen_2.get_size()).convert()
+            self.render(self.grid_layer)
+        scroll = self.static_layer is not None
+        if scroll:
+            shift_x, shift_y = camera[0] - self.static_camera[0], camera[1] - self.static_camera[1]
+            scroll = abs(shift_x) < self.grid_layer.get_width() and abs(shift_y) < self.grid_layer.get_height()
+        if not scroll:
+            self.static_layer = self.grid_layer.copy()
+            fresh = cells
+        else:
+            self.static_layer.scroll(shift_x, shift_y)
+            shown = set(self.visible_cells(camera=self.static_camera))
+            fresh = [cell for cell in cells if cell not in shown]
+            size = self.index.cell_size
+            for x, y in fresh:
+                rect = pygame.Rect(x * size + self.camera_x, y * size + self.camera_y, size, size)
+                self.static_layer.blit(self.grid_layer, rect, rect)
+        self.draw_group(self.visible('wall', fresh), self.static_layer)
+        self.draw_group(self.visible('floor', fresh), self.static_layer)
+        self.static_camera = camera
+        return True
+
+    def draw_level(self, screen):
+        view = self.screen_2.get_rect()
+        cells = self.visible_cells()
+        rebuilt = self.update_static_layer(cells)
+        self.screen_2.blit(self.static_layer, (0, 0))
+        # Монстр между клетками может выглядывать из соседней с окном клетки
+        monsters = list(self.index.monsters_in(self.visible_cells(margin=1)))
+        water = self.visible('water', cells)
+        for kind in ('key', 'door', 'chip', 'sand', 'portal'):
+            self.draw_group(self.visible(kind, cells), self.screen_2)
+        for group in (self.player, water, monsters):
+            self.draw_group(group, self.screen_2)
+        screen.blit(self.screen_2, (self.left, self.top))
+        # Между ходами меняются только анимированные спрайты: их старые и новые прямоугольники
+        animated = [sprite.rect.move(self.camera_x, self.camera_y)
+                    for group in (self.player, water, monsters) for sprite in group]
+        dirty = [view] if rebuilt else self.last_rects + animated
+        self.last_rects = animated
+        return [rect.clip(view).move(self.left, self.top) for rect in dirty if rect.colliderect(view)]
+
+    def check_monster_collision(self):
+        for monster in self.index.monsters_near(self.index.cell(self.p1.rect)):
+            if pygame.sprite.collide_mask(self.p1, monster):
+                return True
+        return False
+
+    def load_record(self):
+        return get_score_store().best(1)
+
+    def save_record(self, time_left, total_score):
+        get_score_store().update_record(1, time_left, total_score)
+
+
+class Inventory(Board):
+    def __init__(self, width, height):
+        super().__init__(width, height)
+        self.items = []
+
+    def render(self, screen):
+        for y in range(self.height):
+            for x in range(self.width):
+                pygame.draw.rect(screen, 'white', (
+                    x * self.cell_size + self.left, y * self.cell_size + self.top,
+                    self.cell_size, self.cell_size), width=1)
+                pygame.draw.rect(screen, GRAY, (
+                    x * self.cell_size + self.left + 1, y * self.cell_size + self.top + 1,
+                    self.cell_size - 2, self.cell_size - 2))
+        for i, item in enumerate(self.items):
+            item.rect.x = self.left + i * self.cell_size
+            item.rect.y = self.top
+            screen.blit(item.image, item.rect)
+
+    def add_to_inventory(self, item):
+        if len(self.items) < self.width:
+            self.items.append(item)
+
+
+class Simulation:
+    # Правила игры без отрисовки: один вызов step() - один тик фиксированной длины
+    def __init__(self, level, trajectories=None, time_left=100, chips_left=5):
+        self.board = Board(BOARD_WIDTH, BOARD_HEIGHT)
+        self.inventory = Inventory(7, 1)
+        self.load(level, trajectories, time_left, chips_left)
+
+    def load(self, level, trajectories=None, time_left=100, chips_left=5):
+        self.level = level
+        self.trajectories = trajectories
+        self.board.load_level(level, trajectories)
+        self.inventory.items = []
+        self.start_time_left = time_left
+        self.start_chips_left = chips_left
+        self.time_left = time_left
+        self.chips_left = chips_left
+        self.tick = 0
+        self.countdown = 0
+        self.game_over = False
+        self.level_complete = False
+        self.portal_active = False
+        self.pending = []
+        self.inputs = []
+
+    def press(self, dx, dy):
+        if dx or dy:
+            self.pending.append((dx, dy))
+
+    def apply_move(self, dx, dy):
+        self.chips_left = self.board.move_level(dx, dy, self.inventory, self.chips_left)
+        if self.chips_left == 0:
+            self.portal_active = True
+        if self.board.player_on('water'):
+            self.game_over = True
+        if self.board.player_on('portal') and self.chips_left == 0:
+            self.level_complete = True
+
+    def step(self):
+        for dx, dy in self.pending:
+            if not self.game_over and not self.level_complete:
+                self.inputs.append((self.tick, dx, dy))
+                self.apply_move(dx, dy)
+        self.pending = []
+        if not self.game_over and not self.level_complete:
+            if self.chips_left > 0:
+                self.countdown += 1
+                if self.countdown >= TICKS_PER_SECOND:
+                    self.countdown = 0
+                    self.time_left -= 1
+                if self.time_left <= 0:
+                    self.game_over = True
+            self.board.move_monsters()
+            if self.board.check_monster_collision():
+                self.game_over = True
+        self.tick += 1
+
+    def state(self):
+        return {'tick': self.tick, 'player': list(self.board.index.cell(self.board.p1.rect)),
+                'chips_left': self.chips_left, 'time_left': self.time_left, 'keys': len(self.inventory.items),
+                'game_over': self.game_over, 'level_complete': self.level_complete}
+
+    def save_replay(self, filename):
+        with open(filename, 'w') as file:
+            json.dump({'level': self.level, 'trajectories': self.trajectories,
+                       'time_left': self.start_time_left, 'chips_left': self.start_chips_left,
+                       'inputs': self.inputs, 'result': self.state()}, file)
+
+    @classmethod
+    def replay(cls, filename):
+        with open(filename, 'r') as file:
+            data = json.load(file)
+        simulation = cls(data['level'], data['trajectories'], data['time_left'], data['chips_left'])
+        inputs = data['inputs']
+        i = 0
+        while simulation.tick < data['result']['tick']:
+            while i < len(inputs) and inputs[i][0] == simulation.tick:
+                simulation.press(inputs[i][1], inputs[i][2])
+                i += 1
+            simulation.step()
+        return simulation, simulation.state() == data['result']
+
+
+class Button:
+    def __init__(self, text, x, y, width, height, action=None, nonpress_image=None,
+                 press_image=None):
+        self.text = text
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.action = action
+        if self.text != '':
+            self.font = pygame.font.Font(None, 36)
+            self.text_surface = self.font.render(text, True, BLACK)
+            self.text_rect = self.text_surface.get_rect(center=(x + width // 2, y + height // 2))
+        self.image = nonpress_image
+        self.rect = self.image.get_rect()
+        self.rect = self.rect.move(x, y)
+        self.pressed_image = press_image
+        self.nonpress_image = nonpress_image
+
+    def draw(self, screen):
+        # Картинку выбираем до вывода: экраны меню перерисовываются только по событиям
+        mouse_pos = pygame.mouse.get_pos()
+        self.image = self.pressed_image if self.rect.collidepoint(mouse_pos) else self.nonpress_image
+        screen.blit(self.image, self.rect)
+        if self.text != '':
+            screen.blit(self.text_surface, self.text_rect)
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.rect.collidepoint(event.pos) and self.action:
+                self.action()
+
+
+class PopupWindow:
+    def __init__(self, screen, text, width, height, background_image=None, close_image=None, pressed_close_image=None):
+        self.screen = screen
+        self.width = width
+        self.height = height
+        self.text = text
+        self.font = pygame.font.Font(None, 24)
+        self.text_surface = self.font.render(text, True, BLACK)
+        self.text_rect = self.text_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+        self.rect = pygame.Rect(SCREEN_WIDTH // 2 - width // 2, SCREEN_HEIGHT // 2 - height // 2, width, height)
+        self.running = True
+        self.close_button = Button('', self.rect.x + self.width - 140, self.rect.y + self.height, 120, 30
+                                   , self.close, nonpress_image=close_image,
+                                   press_image=pressed_close_image)
+        self.background_image = background_image
+        self.line_spacing = 5
+        self.text_surfaces = self.render_text()
+
+    def close(self):
+        self.running = False
+
+    def render_text(self):
+        lines = self.text.split('\n')
+        text_surfaces = []
+        y = self.rect.y + 20
+        for line in lines:
+            text_surface = self.font.render(line, True, BLACK)
+            text_rect = text_surface.get_rect(center=(SCREEN_WIDTH // 2, y))
+            text_surfaces.append((text_surface, text_rect))
+            y += text_surface.get_height() + self.line_spacing
+        return text_surfaces
+
+    def run(self):
+        redraw = True
+        while self.running:
+            events = scheduler.events(idle=True)
+            with scheduler.phase('events'):
+                for event in events:
+                    if event.type == pygame.QUIT:
+                        pygame.quit()
+                        sys.exit()
+                    self.close_button.handle_event(event)
+            # Окно статично: перерисовываем его только после событий (например, наведения на кнопку)
+            if (redraw or events) and self.running:
+                with scheduler.phase('draw'):
+                    self.screen.blit(self.background_image, self.rect)
+                    for text_surface, text_rect in self.text_surfaces:
+                        self.screen.blit(text_surface, text_rect)
+                    self.close_button.draw(self.screen)
+                scheduler.present(self.screen)
+                redraw = False
+            scheduler.end_frame(idle=True)
+
+
+class StartWindow:
+    def __init__(self, screen):
+        self.screen = screen
+        self.buttons = []
+        self.running = True
+        self.background_image = load_image('dungeon_entrance.jpg')
+        self.play = load_image('play_.png', colorkey=-1)
+        self.pressed_play = load_image('pressed_play_.png', colorkey=-1)
+        self.about = load_image('about_.png', colorkey=-1)
+        self.pressed_about = load_image('pressed_about_.png', colorkey=-1)
+        self.rule = load_image('rule_.png', colorkey=-1)
+        self.pressed_rule = load_image('pressed_rule_.png', colorkey=-1)
+        self.beton_image = pygame.transform.scale(load_image('wallpaper_.png', colorkey=-1), (450, 300))
+        self.exit = load_image('exit_.png', colorkey=-1)
+        self.pressed_exit = load_image('pressed_exit_.png', colorkey=-1)
+        self.start_game_table_rect = None
+        self.create_buttons()
+        self.popup_window = None
+        self.animation_start_time = 0
+        self.animation_duration = 2
+        self.animating = False
+
+    def create_buttons(self):
+        button_width = 200
+        button_height = 50
+        start_x = SCREEN_WIDTH // 2
+        button_y = 200
+        space = 80
+        self.buttons.append(
+            Button('', start_x - 100, button_y, button_width, button_height, self.start_game,
+                   self.play, self.pressed_play))
+        self.start_game_table_rect = self.buttons[0].rect
+        button_y += space
+        self.buttons.append(
+            Button('', start_x - 90, button_y, button_width, button_height, self.show_about,
+                   nonpress_image=self.rule, press_image=self.pressed_rule))
+        button_y += space
+        self.buttons.append(Button('', start_x - 100, button_y, button_width, button_height,
+                                   self.show_authors, nonpress_image=self.about, press_image=self.pressed_about))
+
+    def start_game(self):
+        self.running = False
+
+    def show_about(self):
+        self.popup_window = PopupWindow(self.screen,
+                                        '\n\n\nУправляйте персонажем с помощью WASD.'
+                                        '\n\nИзбегайте опасностей.\n\nСледи за временем.'
+                                        '\n\nСобирайте сундуки.',
+                                        450, 300,
+                                        self.beton_image, self.exit, self.pressed_exit)
+        self.popup_window.run()
+        self.popup_window = None
+
+    def show_authors(self):
+        self.popup_window = PopupWindow(self.screen,
+                                        '\n\n\n\n\nНад проектом работали:\nСпивак Максим Игоревич - @Maxusmini\n'
+                                        'Кривова Полина Дмитриевна - @polly_kriv\n2024-2025\n', 450, 300,
+                                        self.beton_image, self.exit, self.pressed_exit)
+        self.popup_window.run()
+        self.popup_window = None
+
+    def run(self):
+        redraw = True
+        while self.running:
+            events = scheduler.events(idle=True)
+            with scheduler.phase('events'):
+                for event in events:
+                    if event.type == pygame.QUIT:
+                        pygame.quit()
+                        sys.exit()
+                    if self.running:
+                        for button in self.buttons:
+                            button.handle_event(event)
+            if redraw or events:
+                with scheduler.phase('draw'):
+                    self.screen.fill(BLACK)
+                    self.screen.blit(self.background_image,
+                                     ((SCREEN_WIDTH - self.background_image.get_width()) // 2, 0))
+                    if self.running:
+                        for button in self.buttons:
+                            button.draw(self.screen)
+                scheduler.present(self.screen)
+                redraw = False
+            scheduler.end_frame(idle=True)
+
+
+class DB():
+    def __init__(self, main_screen):
+        self.WIDTH = 500
+        self.HEIGHT = 550
+        self.modal = pygame.Surface((self.WIDTH, self.HEIGHT))
+        self.modal.fill(GRAY)
+        self.screen = main_screen
+        self.store = get_score_store()
+        self.font3 = pygame.font.Font(None, 24)
+        # Таблица рисуется на self.modal заново, только когда меняются данные в базе
+        self.table_data = None
+        self.lesson_rects = {}
+
+    def draw_text(self, text, font, color, x, y, align="left"):
+        text_surface = render_text(font, text, color)
+        text_rect = text_surface.get_rect()
+        if align == "left":
+            text_rect.topleft = (x, y)
+        elif align == "center":
+            text_rect.center = (x, y)
+        elif align == "right":
+            text_rect.topright = (x, y)
+        self.modal.blit(text_surface, text_rect)
+        return text_rect
+
+    def draw_table(self):
+        header_y = 40
+        row_height = 30
+        column_spacing = 150
+        level_x = 50
+        score_x = level_x + column_spacing
+        time_x = score_x + column_spacing
+        pygame.draw.line(self.modal, BLACK, (level_x - 10, header_y + 20), (time_x + 100, header_y + 20), 1)
+        self.draw_text("Level", self.font3, BLACK, level_x, header_y)
+        self.draw_text("Score", self.font3, BLACK, score_x + 40, header_y + 6, align="center")
+        self.draw_text("Time", self.font3, BLACK, time_x + 20, header_y + 6, align="center")
+        scores = self.store.scores()
+        y_pos = header_y + row_height
+        lesson_rects = {}
+        for lesson_number, score, time in scores:
+            pygame.draw.line(self.modal, GRAY, (level_x - 10, y_pos + 20), (time_x + 100, y_pos + 20), 1)
+            level_text = f"{lesson_number}    LESSON {lesson_number}"
+            lesson_rects[lesson_number] = self.draw_text(level_text, self.font3, BLACK, level_x, y_pos)
+            score_text = str(score) if score is not None else "---"
+            self.draw_text(score_text, self.font3, BLACK, score_x + 40, y_pos + 6, align="center")
+            time_text = str(time) if time is not None else "---"
+            self.draw_text(time_text, self.font3, BLACK, time_x + 20, y_pos + 6, align="center")
+            y_pos += row_height
+
+        pygame.draw.line(self.modal, BLACK, (level_x - 10, y_pos + 20), (time_x + 100, y_pos + 20), 1)
+        self.draw_text("LEVEL SET TOTAL", self.font3, BLACK, level_x, y_pos)
+
+        # Подсчет и вывод общего счета
+        total = self.store.total()
+        self.draw_text(str(total), self.font3, BLACK, score_x + 40, y_pos + 6, align="center")
+
+        # Добавление текста для закрытия таблицы
+        self.draw_text("To close the table, press the 'm' key", self.font3, BLACK, level_x, y_pos + 40)
+
+        return lesson_rects
+
+    def run(self):
+        # Дожидаемся записи только что сыгранного результата, чтобы он сразу попал в таблицу
+        self.store.flush()
+        running = True
+        redraw = True
+        lesson_rects = {}
+        while running:
+            events = scheduler.events(idle=True)
+            with scheduler.phase('events'):
+                for event in events:
+                    if event.type == pygame.QUIT:
+                        running = False
+                    if event.type == pygame.MOUSEBUTTONDOWN:
+                        mouse_pos = pygame.mouse.get_pos()
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_m:
+                        running = False  # Закрыть модальное окно при нажатии 'm'
+
+            # Таблица меняется только после записи результата, поэтому без событий кадр не перерисовываем
+            if redraw or events:
+                with scheduler.phase('draw'):
+                    table_data = (self.store.scores(), self.store.total())
+                    if table_data != self.table_data:
+                        self.modal.fill(GRAY)  # Заливаем модальное окно
+                        self.lesson_rects = self.draw_table()  # Рисуем таблицу
+                        self.table_data = table_data
+                    lesson_rects = self.lesson_rects
+                    self.screen.blit(self.modal, (100, 100))
+                scheduler.present(self.screen)
+                redraw = False
+            scheduler.end_frame(idle=True)
+
+
+class Level_button(pygame.sprite.Sprite):
+    def __init__(self, level_image, center):
+        super().__init__()
+        self.image_normal = level_image
+        self.image_pressed = pygame.transform.scale(level_image, (
+            level_image.get_width(), level_image.get_height()))  # Используйте то же изображение или другое
+        self.image = self.image_normal
+        self.rect = self.image.get_rect(center=center)
+        self.is_pressed = False
+
+    def update(self, mouse_pos, mouse_click):
+        if self.rect.collidepoint(mouse_pos):
+            if mouse_click:
+                self.is_pressed = not self.is_pressed
+                if self.is_pressed:
+                    self.image = self.image_pressed  # Если нажат, меняем изображение
+                    self.open_new_window()  # вызываем метод для открытия нового окна
+                else:
+                    self.image = self.image_normal  # Если не нажат, возвращаем оригинальное изображение
+
+    def open_new_window(self):
+        # Здесь происходит логика открытия нового окна или уровня
+        print("Кнопка нажата! Открывается новое окно.")
+
+    def draw(self, surface):
+        surface.blit(self.image, self.rect)
+
+
+pygame.init()
+font_size = 40
+font1 = pygame.font.Font(None, font_size)
+font2 = pygame.font.Font("data/DS-DIGIB.TTF", font_size)
+scheduler = FrameScheduler(TICKS_PER_SECOND, FRAMES_PER_SECOND, IDLE_FRAMES_PER_SECOND)
+start_time = pygame.time.get_ticks()
+game_duration = 100
+level = 1
+digit_width = 20
+digit_height = 20
+PAUSE_BUTTON_X = 700
+PAUSE_BUTTON_Y = 760
+PAUSE_BUTTON_WIDTH = 120
+PAUSE_BUTTON_HEIGHT = 40
+y_offset = SCREEN_HEIGHT - digit_height
+# Сдвиг уровня для клавиш WASD: игрок стоит в центре, поэтому карта едет в обратную сторону
+MOVE_KEYS = {pygame.K_d: (-1, 0), pygame.K_a: (1, 0), pygame.K_w: (0, 1), pygame.K_s: (0, -1)}
+HUD_RECTS = [pygame.Rect(780, 680, 90, 60), pygame.Rect(265, 765, 90, 60), pygame.Rect(265, 680, 90, 60)]
+HUD_AREA = pygame.Rect(90, 690, 810, 150)
+
+
+def draw_digit(screen, number, x, y, color):
+    num_str = str(number).zfill(3)
+    for i, digit in enumerate(num_str):
+        digit_surface = render_text(font2, digit, color)
+        digit_rect = digit_surface.get_rect(center=(x + digit_width * i + digit_width // 2, y + digit_height // 2))
+        screen.blit(digit_surface, digit_rect)
+
+
+def draw_text(screen, text, x, y, color):
+    text_surface = render_text(font1, text, color)
+    screen.blit(text_surface, (x, y))
+
+
+def draw_clock_face(screen, x, y, width, height, color):
+    pygame.draw.rect(screen, color, (x, y, width, height))
+
+
+class Music():
+    @staticmethod
+    def play():
+        pygame.mixer.music.load("music.mp3")
+        pygame.mixer.music.play(-1)
+
+
+class Pause_button(Button):
+    def __init__(self, text, x, y, width, height, nonpress_image=None
+                 , press_image=None):
+        super().__init__(text, x, y, width, height, nonpress_image=nonpress_image,
+                         press_image=press_image)
+        self.is_paused = False
+
+    def pause(self, is_paused):
+        self.is_paused = is_paused
+        self.image = self.pressed_image if self.is_paused else self.nonpress_image
+
+    def draw(self, screen):
+        screen.blit(self.image, self.rect)
+
+
+class HUD:
+    # Таймер, уровень, счётчик сундуков и кнопка паузы собираются в одну поверхность,
+    # которая пересобирается только при изменении показываемых значений
+    def __init__(self, pause_button):
+        self.pause_button = pause_button
+        self.surface = pygame.Surface(HUD_AREA.size).convert()
+        self.values = None
+
+    def draw(self, screen, time_left, current_level, chips_left, is_paused):
+        values = (time_left, current_level, chips_left, is_paused)
+        changed = values != self.values
+        if changed:
+            self.values = values
+            self.compose(*values)
+        screen.blit(self.surface, HUD_AREA)
+        return HUD_RECTS if changed else []
+
+    def compose(self, time_left, current_level, chips_left, is_paused):
+        surface = self.surface
+        left, top = HUD_AREA.topleft
+        surface.fill(BLACK)
+        draw_text(surface, "TIME:", 700 - left, 740 - font_size - top, YELLOW)
+        draw_clock_face(surface, 790 - left, 690 - top, 70, 40, GREEN)
+        draw_digit(surface, time_left, 794 - left, 700 - top, LIGHT_YELLOW)
+        draw_text(surface, "LEVEL:", 90 - left, 780 - top, YELLOW)
+        draw_clock_face(surface, 275 - left, 775 - top, 70, 40, GREEN)
+        draw_digit(surface, current_level, 282 - left, 782 - top, LIGHT_YELLOW)
+        draw_text(surface, "STARS LEFT:", 90 - left, 740 - font_size - top, YELLOW)
+        draw_clock_face(surface, 275 - left, 690 - top, 70, 40, GREEN)
+        draw_digit(surface, chips_left, 280 - left, 700 - top, LIGHT_YELLOW)
+        surface.blit(self.pause_button.image, self.pause_button.rect.move(-left, -top))
+
+
+# Основная функция игры
+def save_replay(game, directory, number):
+    os.makedirs(directory, exist_ok=True)
+    game.save_replay(os.path.join(directory, f'{number:03d}_{os.path.splitext(game.level)[0]}.json'))
+
+
+def main(profile=None, overlay=False, record=None):
+    pygame.init()  # Инициализация Pygame
+    screen = pygame.display.set_mode((1000, 850))  # Установите размер экрана
+    pygame.display.set_caption('Level Mover')
+    Music.play()
+
+    # Определение переменных
+    current_level = 1
+    scheduler.show_overlay = overlay
+    start_window = StartWindow(screen)
+    assets.preload(ASSET_FILES)
+    start_window.run()
+    assets.wait_preload()
+    dataBase = DB(screen)  # Создаем экземпляр БД
+
+    running = True
+    is_paused = False
+    win_screen_active = False
+    full_redraw = True
+    last_state = None
+    next_animation = scheduler.now
+    # Каждая завершённая попытка (победа или проигрыш) сохраняется в отдельный файл повтора
+    replays = 0
+    recorded = False
+    level_image = load_image('level_but.png', colorkey=-1)
+
+    level_center = (50, 50)
+    level_button = Level_button(level_image, level_center)
+
+    all_sprites = pygame.sprite.Group(level_button)
+
+    if not start_window.running:
+        game = Simulation(LEVEL1_FILE)
+        board = game.board
+        inventory = game.inventory
+        inventory.set_view(board.left + TILE_SIZE,
+                           board.top + board.cell_size * board.height + TILE_SIZE,
+                           board.cell_size)
+
+        pause_button = Pause_button('', PAUSE_BUTTON_X, PAUSE_BUTTON_Y, PAUSE_BUTTON_WIDTH, PAUSE_BUTTON_HEIGHT,
+                                    nonpress_image=load_image('pause_.png', colorkey=-1),
+                                    press_image=load_image('pressed_pause_.png', colorkey=-1))
+        hud = HUD(pause_button)
+        scheduler.logic_ticks(paused=True)
+
+        while running:
+            # Пауза, проигрыш и экран победы почти статичны, на них цикл переходит на редкие кадры
+            idle = is_paused or game.game_over or win_screen_active
+            events = scheduler.events(idle=idle)
+            with scheduler.phase('events'):
+                for event in events:
+                    if event.type == pygame.QUIT:
+                        running = False
+                    if event.type != pygame.MOUSEMOTION:
+                        full_redraw = True
+
+                    mouse_pos = pygame.mouse.get_pos()
+                    if pause_button.rect.collidepoint(mouse_pos) and pygame.mouse.get_pressed()[0]:
+                        is_paused = not is_paused
+                        pause_button.pause(is_paused)
+
+                    if event.type == pygame.KEYDOWN and event.key in MOVE_KEYS and not is_paused \
+                            and not game.game_over and not game.level_complete:
+                        game.press(*MOVE_KEYS[event.key])
+
+                    if event.type == pygame.KEYDOWN:
+                        if game.game_over and event.key == pygame.K_RETURN:
+                            game.load(LEVEL1_FILE)
+
+                    if win_screen_active and event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_SPACE:
+                            current_level = 1
+                            win_screen_active = False
+                            game.load(LEVEL1_FILE)
+
+                    if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                        if level_button.rect.collidepoint(mouse_pos):
+                            dataBase.run()  # Запустить модальное окно БД
+
+            with scheduler.phase('simulation'):
+                for _ in range(scheduler.logic_ticks(paused=is_paused)):
+                    game.step()
+                finished = game.game_over or game.level_complete
+                if record and finished and not recorded:
+                    replays += 1
+                    save_replay(game, record, replays)
+                recorded = finished
+                if game.portal_active:
+                    for tile in board.portal:
+                        tile.image = load_image('activated_portal.png', colorkey=-1)
+
+                if game.level_complete and not win_screen_active:
+                    total_score = 1000 + game.time_left * 10
+                    board.save_record(game.time_left, total_score)
+                    # Запись уходит в фоновый поток и не задерживает отрисовку
+                    get_score_store().add_result(current_level, game.time_left, total_score)
+                    inventory.items = []
+
+                    if current_level == 2:
+                        win_screen_active = True
+                    else:
+                        current_level += 1
+                        game.load(LEVEL2_FILE)
+
+            with scheduler.phase('draw'):
+                screen.fill(BLACK)
+                dirty_rects = []
+
+                if win_screen_active:
+                    win_image = load_image("win.png")
+                    win_rect = win_image.get_rect(center=screen.get_rect().center)
+                    screen.blit(win_image, win_rect)
+                else:
+                    hud_rects = hud.draw(screen, game.time_left, current_level, game.chips_left, is_paused)
+                    dirty_rects = board.draw_level(screen) + hud_rects
+                    inventory.render(screen)
+
+                    if next_animation <= scheduler.now:
+                        board.player.update()
+                        board.monsters.update()
+                        next_animation = scheduler.now + ANIMATION_MS
+                        board.water.update()
+
+                    if game.game_over:
+                        current_level = 1
+                        die_image = load_image("die_window_.png")
+                        die_rect = die_image.get_rect()
+                        die_rect.topleft = (325, 107)
+                        inventory.items = []
+                        screen.blit(die_image, die_rect)
+
+                    all_sprites.draw(screen)
+
+            state = (is_paused, game.game_over, win_screen_active, current_level, len(inventory.items))
+            scheduler.present(screen, None if full_redraw or state != last_state else dirty_rects)
+            full_redraw = False
+            last_state = state
+            scheduler.end_frame(idle=idle)
+
+        if record and not recorded and game.tick:
+            save_replay(game, record, replays + 1)
+
+    if profile:
+        scheduler.export(profile)
+    close_score_store()
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Hurry Up')
+    parser.add_argument('--profile', help='сохранить время фаз каждого кадра в CSV или JSON (по расширению)')
+    parser.add_argument('--overlay', action='store_true', help='показывать время фаз на экране (F3)')
+    parser.add_argument('--record', metavar='DIR', help='сохранять повтор каждой попытки в каталог DIR')
+    args = parser.parse_args()
+    main(args.profile, args.overlay, args.record)
\ No newline at end of file
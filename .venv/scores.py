@@ -0,0 +1,87 @@
+import queue
+import sqlite3
+import threading
+
+DB_FILE = 'gamer.db'
+
+
+class ScoreStore:
+    # Одно соединение на всю игру: чтение идёт из кеша, запись - через очередь в фоновом потоке
+    def __init__(self, filename=DB_FILE):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS gamer (
+            id INTEGER PRIMARY KEY,
+            level_name INTEGER,
+            score INTEGER,
+            time INTEGER
+        )''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS gamer_level_name ON gamer (level_name)')
+        self.conn.commit()
+        self.cache = {}
+        self.writes = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+
+    def seed(self, initial_data):
+        with self.lock:
+            if self.conn.execute("SELECT COUNT(*) FROM gamer").fetchone()[0] == 0:
+                self.conn.executemany("INSERT INTO gamer (id, level_name, score, time) VALUES (?, ?, ?, ?)",
+                                      initial_data)
+                self.conn.commit()
+            self.cache.clear()
+
+    def query(self, key, sql, params=()):
+        rows = self.cache.get(key)
+        if rows is None:
+            with self.lock:
+                rows = self.conn.execute(sql, params).fetchall()
+                self.cache[key] = rows
+        return rows
+
+    def scores(self):
+        return self.query('scores', "SELECT level_name, score, time FROM gamer")
+
+    def total(self):
+        total = self.query('total', "SELECT sum(score) FROM gamer WHERE score IS NOT NULL")[0][0]
+        return total if total is not None else 0
+
+    def best(self, level_name):
+        record = self.query(('best', level_name), "SELECT MAX(score) FROM gamer WHERE level_name=?",
+                            (level_name,))[0][0]
+        return record if record is not None else 0
+
+    def add_result(self, level_name, time_left, score):
+        self.writes.put(("INSERT INTO gamer(time, score, level_name) VALUES(?, ?, ?)",
+                         (time_left, score, level_name)))
+
+    def update_record(self, level_name, time_left, score):
+        self.writes.put(('UPDATE gamer SET time = ?, score = ? WHERE level_name = ?',
+                         (time_left, score, level_name)))
+
+    def write_loop(self):
+        while True:
+            item = self.writes.get()
+            if item is None:
+                self.writes.task_done()
+                break
+            sql, params = item
+            try:
+                with self.lock:
+                    self.conn.execute(sql, params)
+                    self.conn.commit()
+                    self.cache.clear()
+            except sqlite3.Error as error:
+                print("Ошибка при работе с SQLite", error)
+            finally:
+                self.writes.task_done()
+
+    def flush(self):
+        self.writes.join()
+
+    def close(self):
+        self.writes.put(None)
+        self.writer.join()
+        self.conn.close()
@@ -0,0 +1,350 @@
+import os
+import sys
+import glob
+import math
+import heapq
+import argparse
+import itertools
+from collections import deque
+
+# Направление движения игрока и клавиша, которая его вызывает в main()
+MOVES = [(1, 0, 'd'), (-1, 0, 'a'), (0, -1, 'w'), (0, 1, 's')]
+WALLS = '#ZC'
+UNREACHABLE = 1 << 30
+# Больше наборов сундуков (или клеток во всех таблицах вместе) таблицы оценки не строятся
+MAX_TABLES = 256
+MAX_TABLE_CELLS = 1 << 21
+
+
+class Level:
+    # Разбор карты по тем же правилам, что и create_level
+    def __init__(self, rows, chips_needed=5):
+        self.width = max(len(row) for row in rows)
+        self.height = len(rows)
+        size = self.width * self.height
+        self.chips_needed = chips_needed
+        self.wall = bytearray(size)
+        self.water = [-1] * size
+        self.door = [-1] * size
+        self.key = [-1] * size
+        self.chip = [-1] * size
+        self.portal = bytearray(size)
+        self.door_colors = []
+        self.key_colors = []
+        self.chip_cells = []
+        self.portal_cells = []
+        self.start = None
+        self.sand = bytearray(size)
+        water_count = 0
+        for y, row in enumerate(rows):
+            for x, tile_type in enumerate(row):
+                cell = y * self.width + x
+                if tile_type in WALLS:
+                    self.wall[cell] = 1
+                elif tile_type == 'P':
+                    self.start = cell
+                elif tile_type in 'rbgy':
+                    self.key[cell] = len(self.key_colors)
+                    self.key_colors.append('rbgy'.index(tile_type))
+                elif tile_type in 'RBGY':
+                    self.door[cell] = len(self.door_colors)
+                    self.door_colors.append('RBGY'.index(tile_type))
+                elif tile_type == '*':
+                    self.chip[cell] = len(self.chip_cells)
+                    self.chip_cells.append(cell)
+                elif tile_type == 'W':
+                    self.water[cell] = water_count
+                    water_count += 1
+                elif tile_type == 'S':
+                    self.sand[cell] = 1
+                elif tile_type == 'O':
+                    self.portal[cell] = 1
+                    self.portal_cells.append(cell)
+        if self.start is None:
+            raise ValueError('на карте нет игрока P')
+        # Состояние: одно целое (клетка | сундуки | ключи | двери | засыпанная вода) и песок как разница
+        # со стартовой картой - освобождённые и занятые клетки, которых обычно единицы
+        self.cell_bits = size.bit_length()
+        self.chips_shift = self.cell_bits
+        self.keys_shift = self.chips_shift + len(self.chip_cells)
+        self.doors_shift = self.keys_shift + len(self.key_colors)
+        self.water_shift = self.doors_shift + len(self.door_colors)
+        self.water_bits = water_count
+        self.adjacent = [list(self.find_neighbours(cell)) for cell in range(size)]
+        self.build_tables()
+
+    def find_neighbours(self, cell):
+        x, y = cell % self.width, cell // self.width
+        for dx, dy, key in MOVES:
+            if 0 <= x + dx < self.width and 0 <= y + dy < self.height and not self.wall[cell + dy * self.width + dx]:
+                yield cell + dy * self.width + dx
+
+    def neighbours(self, cell):
+        return self.adjacent[cell]
+
+    def spread(self, seeds, blocked=()):
+        # Обход в ширину из нескольких источников со своими стартовыми значениями
+        distance = [UNREACHABLE] * (self.width * self.height)
+        seeds = sorted((value, cell) for value, cell in seeds if value < UNREACHABLE and cell not in blocked)
+        seeds.reverse()
+        queue = deque()
+        while queue or seeds:
+            if seeds and (not queue or seeds[-1][0] <= distance[queue[0]]):
+                value, cell = seeds.pop()
+                if value < distance[cell]:
+                    distance[cell] = value
+                    queue.appendleft(cell)
+                continue
+            cell = queue.popleft()
+            for neighbour in self.neighbours(cell):
+                if neighbour not in blocked and distance[neighbour] > distance[cell] + 1:
+                    distance[neighbour] = distance[cell] + 1
+                    queue.append(neighbour)
+        return distance
+
+    def nearest_chips(self, count):
+        # Для каждой клетки - до count ближайших сундуков в виде (расстояние, номер сундука) по возрастанию
+        nearest = [[] for _ in range(self.width * self.height)]
+        chips = len(self.chip_cells)
+        # Каждая пара (клетка, сундук) попадает в очередь не больше одного раза
+        queued = {cell * chips + i for i, cell in enumerate(self.chip_cells)}
+        queue = deque((cell, i, 0) for i, cell in enumerate(self.chip_cells))
+        while queue:
+            cell, chip, distance = queue.popleft()
+            labels = nearest[cell]
+            if len(labels) >= count:
+                continue
+            labels.append((distance, chip))
+            for neighbour in self.adjacent[cell]:
+                pair = neighbour * chips + chip
+                if len(nearest[neighbour]) < count and pair not in queued:
+                    queued.add(pair)
+                    queue.append((neighbour, chip, distance + 1))
+        return nearest
+
+    def build_tables(self):
+        # Точная цена до конца в упрощённой задаче, где песок, вода и двери проходимы,
+        # для каждого набора собранных сундуков: (ходы до последнего сундука, ходы до портала)
+        self.timed_table = {}
+        self.moves_table = {}
+        count = len(self.chip_cells)
+        size = self.width * self.height
+        # Наборы считаем заранее: перебор всех 2^count масок на картах с десятками сундуков не закончится
+        tables = sum(math.comb(count, collected) for collected in range(self.chips_needed + 1))
+        if tables > MAX_TABLES or tables * size > MAX_TABLE_CELLS:
+            self.build_nearest_tables()
+            return
+        masks = (sum(1 << i for i in chips)
+                 for collected in range(min(self.chips_needed, count), -1, -1)
+                 for chips in itertools.combinations(range(count), collected))
+        for mask in masks:
+            uncollected = [i for i in range(count) if not mask >> i & 1]
+            blocked = {self.chip_cells[i] for i in uncollected}
+            if bin(mask).count('1') == self.chips_needed:
+                # Лишний сундук делает уровень непроходимым, поэтому обходим их
+                self.timed_table[mask] = [0] * size
+                self.moves_table[mask] = self.spread([(0, portal) for portal in self.portal_cells], blocked)
+                continue
+            timed_seeds = []
+            moves_seeds = []
+            for i in uncollected:
+                chip = self.chip_cells[i]
+                collected = mask | 1 << i
+                for neighbour in self.neighbours(chip):
+                    timed_seeds.append((self.timed_table[collected][chip] + 1, neighbour))
+                    moves_seeds.append((self.moves_table[collected][chip] + 1, neighbour))
+            self.timed_table[mask] = self.spread(timed_seeds, blocked)
+            self.moves_table[mask] = self.spread(moves_seeds, blocked)
+
+    def build_nearest_tables(self):
+        # Сундуков много: оценка строится по chips_needed ближайшим сундукам каждой клетки. Пока таймер идёт,
+        # собрано меньше chips_needed сундуков, так что среди них всегда есть нужное число несобранных
+        self.portal_distance = self.spread([(0, portal) for portal in self.portal_cells])
+        self.nearest = self.nearest_chips(self.chips_needed + 1)
+        # Расстояние от сундука до ближайшего другого и от сундука до портала, по возрастанию
+        self.chip_gaps = sorted((self.nearest[chip][1][0] if len(self.nearest[chip]) > 1 else UNREACHABLE, i)
+                                for i, chip in enumerate(self.chip_cells))
+        self.portal_legs = sorted((self.portal_distance[chip], i) for i, chip in enumerate(self.chip_cells))
+
+    def pack(self, cell, chips, keys, doors, water):
+        return cell | chips << self.chips_shift | keys << self.keys_shift | doors << self.doors_shift \
+            | water << self.water_shift
+
+    def unpack(self, state):
+        return (state & ((1 << self.cell_bits) - 1),
+                state >> self.chips_shift & ((1 << len(self.chip_cells)) - 1),
+                state >> self.keys_shift & ((1 << len(self.key_colors)) - 1),
+                state >> self.doors_shift & ((1 << len(self.door_colors)) - 1),
+                state >> self.water_shift & ((1 << self.water_bits) - 1))
+
+    def heuristic(self, cell, chips):
+        # Нижняя оценка: (ходов до последнего сундука, ходов до портала)
+        if chips in self.timed_table:
+            return self.timed_table[chips][cell], self.moves_table[chips][cell]
+        collected = bin(chips).count('1')
+        if collected >= self.chips_needed:
+            return 0, self.portal_distance[cell]
+        left = self.chips_needed - collected
+        reach = [distance for distance, i in self.nearest[cell] if not chips >> i & 1][:left]
+        if len(reach) < left:
+            return UNREACHABLE, UNREACHABLE
+        # До сундуков надо дойти хотя бы до left-го ближайшего; кроме того, к каждому следующему сундуку
+        # ведёт путь не короче расстояния от него до ближайшего другого сундука
+        gaps = [gap for gap, i in itertools.islice(
+            ((gap, i) for gap, i in self.chip_gaps if not chips >> i & 1), left - 1)]
+        timed = max(reach[-1], reach[0] + sum(gaps))
+        leg = next(distance for distance, i in self.portal_legs if not chips >> i & 1)
+        return timed, max(self.portal_distance[cell], timed + leg)
+
+    def step(self, state, dx, dy, push_sand=True):
+        # Повторяет Board.move_level; возвращает (новое состояние, уровень пройден) или None, если хода нет
+        packed, vacated, added = state
+        cell, chips, keys, doors, water = self.unpack(packed)
+        x, y = cell % self.width, cell // self.width
+        if not (0 <= x + dx < self.width and 0 <= y + dy < self.height):
+            return None
+        target = cell + dy * self.width + dx
+        if self.wall[target]:
+            return None
+        door = self.door[target]
+        if door >= 0 and not doors >> door & 1:
+            color = self.door_colors[door]
+            if not any(keys >> i & 1 and key_color == color for i, key_color in enumerate(self.key_colors)):
+                return None
+        if self.sand[target] and target not in vacated or target in added:
+            if not push_sand:
+                return None
+            if not (0 <= x + 2 * dx < self.width and 0 <= y + 2 * dy < self.height):
+                return None
+            behind = target + dy * self.width + dx
+            if self.wall[behind] or self.sand[behind] and behind not in vacated or behind in added:
+                return None
+            if target in added:
+                added = added - {target}
+            else:
+                vacated = vacated | {target}
+            pool = self.water[behind]
+            if pool >= 0 and not water >> pool & 1:
+                # Песок засыпает воду
+                water |= 1 << pool
+            elif behind in vacated:
+                vacated = vacated - {behind}
+            else:
+                added = added | {behind}
+        pool = self.water[target]
+        if pool >= 0 and not water >> pool & 1:
+            return None
+        if door >= 0:
+            doors |= 1 << door
+        if self.key[target] >= 0:
+            keys |= 1 << self.key[target]
+        if self.chip[target] >= 0:
+            chips |= 1 << self.chip[target]
+            if bin(chips).count('1') > self.chips_needed:
+                # Лишний сундук уводит счётчик ниже нуля, и портал уже не сработает
+                return None
+        won = bool(self.portal[target]) and bin(chips).count('1') == self.chips_needed
+        return (self.pack(target, chips, keys, doors, water), vacated, added), won
+
+
+def solve(level, max_states=500000, push_sand=True, bound=None):
+    # A* по паре (ходы, пока идёт таймер; все ходы): таймер стоит, когда собраны все сундуки
+    start = (level.pack(level.start, 0, 0, 0, 0), frozenset(), frozenset())
+    best = {start: (0, 0)}
+    parent = {start: None}
+    queue = [(level.heuristic(level.start, 0), 0, 0, (0, 0), start)]
+    if max(queue[0][0]) >= UNREACHABLE:
+        # Даже без песка, воды и дверей нужных сундуков или портала не достать
+        return False, 0
+    expanded = 0
+    pushed = 0
+    while queue:
+        estimate, _, _, cost, state = heapq.heappop(queue)
+        if bound is not None and estimate >= bound:
+            break
+        if best[state] != cost:
+            continue
+        expanded += 1
+        if expanded > max_states:
+            return None, expanded
+        timed, moves = cost
+        chips = level.unpack(state[0])[1]
+        running = bin(chips).count('1') < level.chips_needed
+        for dx, dy, key in MOVES:
+            result = level.step(state, dx, dy, push_sand)
+            if result is None:
+                continue
+            new_state, won = result
+            new_cost = (timed + running, moves + 1)
+            if won:
+                path = [key]
+                while parent[state] is not None:
+                    state, previous_key = parent[state]
+                    path.append(previous_key)
+                return (new_cost[0], ''.join(reversed(path))), expanded
+            if new_state in best and best[new_state] <= new_cost:
+                continue
+            best[new_state] = new_cost
+            parent[new_state] = (state, key)
+            cell, new_chips = level.unpack(new_state[0])[:2]
+            h_timed, h_moves = level.heuristic(cell, new_chips)
+            if h_moves >= UNREACHABLE:
+                continue
+            # При равной оценке первыми раскрываются более глубокие состояния
+            pushed += 1
+            heapq.heappush(queue, ((new_cost[0] + h_timed, new_cost[1] + h_moves), -new_cost[1], pushed,
+                                   new_cost, new_state))
+    return False, expanded
+
+
+def validate(level, max_states=500000):
+    # Путь без сдвига песка ищется быстро и даёт верхнюю границу; полный поиск проверяет только то, что короче неё
+    fallback, fallback_expanded = solve(level, max_states, push_sand=False)
+    bound = (fallback[0], len(fallback[1])) if fallback else None
+    result, expanded = solve(level, max_states, bound=bound)
+    expanded += fallback_expanded
+    proven = result is not None
+    if not result and fallback:
+        result = fallback
+    return result, expanded, proven
+
+
+def read_level(filename):
+    with open(os.path.join('data', filename), 'r') as file:
+        return [line.strip() for line in file]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Проверка проходимости уровней data/level*.txt')
+    parser.add_argument('levels', nargs='*', help='файлы уровней в data/ (по умолчанию все level*.txt)')
+    parser.add_argument('--chips', type=int, default=5, help='сколько сундуков нужно собрать')
+    parser.add_argument('--time-left', type=int, default=100, help='время на уровень, с')
+    parser.add_argument('--move-time', type=float, default=0.25, help='секунд на одно нажатие клавиши')
+    parser.add_argument('--max-states', type=int, default=500000)
+    args = parser.parse_args()
+    levels = args.levels or sorted(os.path.basename(name) for name in glob.glob(os.path.join('data', 'level*.txt')))
+
+    failed = False
+    for filename in levels:
+        level = Level(read_level(filename), args.chips)
+        result, expanded, proven = validate(level, args.max_states)
+        if result is None:
+            print(f'{filename}: поиск остановлен после {expanded} состояний')
+            failed = True
+        elif result is False:
+            print(f'{filename}: НЕ проходится ({expanded} состояний)')
+            failed = True
+        else:
+            timed, path = result
+            seconds = timed * args.move_time
+            verdict = 'успевает' if seconds <= args.time_left else 'НЕ успевает'
+            note = '' if proven else ', оптимальность не доказана'
+            print(f'{filename}: {len(path)} ходов, из них {timed} до последнего сундука '
+                  f'(~{seconds:.1f} с из {args.time_left}, {verdict}{note}); монстры не учитываются')
+            print(f'  {path}')
+            failed = failed or seconds > args.time_left
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())